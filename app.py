@@ -1,179 +1,343 @@
 import os
+import stat
 import asyncio
-from flask import Flask, render_template, request, flash, send_file, redirect, url_for
+import logging
+import importlib
+import threading
+import uuid
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from flask import Flask, render_template, request, flash, send_from_directory, redirect, url_for, jsonify
+from werkzeug.exceptions import NotFound
+from werkzeug.utils import secure_filename
 from datetime import datetime
 
-from scripts.compress_videos_in_folder import compress_videos_in_folder
-from scripts.detect_and_move_corrupt_files import detect_and_move_corrupt_files
-from scripts.search_movie_on_imdb import process_movies
-from scripts.segregate_by_year import segregate_files_by_year
-from scripts.segregate_by_size import segregate_files_by_size
-from scripts.move_long_videos import find_and_move_long_videos
-from scripts.segregate_by_resolution import segregate_files_by_resolution
-from scripts.segregate_by_height_res import segregate_files_by_height
-from scripts.rename_files import rename_files
-from scripts.smart_rename import rename_files_in_folder
-from scripts.sort_move_files import sort_move_files
+try:
+    # libuv-backed loop on platforms that have it; the stdlib loop otherwise
+    from uvloop import new_event_loop
+except ImportError:
+    from asyncio import new_event_loop
+
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 app.secret_key = 'abcde'
-LOG_DIR = os.path.join(os.getcwd(), 'logs')
+# Behind nginx/Apache, let the front server stream log downloads itself
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE') == '1'
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOG_DIR = os.path.join(BASE_DIR, 'logs')
+LOG_PREFIX = LOG_DIR + os.sep
 os.makedirs(LOG_DIR, exist_ok=True)
 
 
+def _resolve_folder(folder_path):
+    """Return the canonical path of folder_path if it is an existing directory, otherwise None."""
+    if not folder_path:
+        return None
+    folder_path = os.path.realpath(folder_path)
+    try:
+        if stat.S_ISDIR(os.stat(folder_path).st_mode):
+            return folder_path
+    except OSError:
+        pass
+    return None
+
+
+def _call_with_log(fn, folder_path, dry_run, log_file, options):
+    return fn(folder_path, dry_run=dry_run, log_path=log_file)
+
+
+def _call_process_movies(fn, folder_path, dry_run, log_file, options):
+    return fn(folder_path, log_path=log_file)
+
+
+def _call_sort_move_files(fn, folder_path, dry_run, log_file, options):
+    destination_mode = options['destination_mode']
+    custom_dest_path = options['custom_dest_path']
+
+    # For mode 3, validate custom destination path
+    dest_path = custom_dest_path if destination_mode == '3' else None
+
+    return fn(folder_path, destination_mode, dest_path=dest_path, dry_run=dry_run, log_path=log_file)
+
+
+# Every selectable operation, keyed by the checkbox value posted from the dashboard.
+# Scripts are only imported once their operation is first requested. 'call' receives
+# the script function plus (folder_path, dry_run, log_file, options); it defaults to
+# passing dry_run and log_path through as keyword arguments.
+OPERATIONS = {
+    'segregate_by_year': {
+        'module': 'scripts.segregate_by_year',
+        'func': 'segregate_files_by_year',
+        'is_async': True,
+        'log_prefix': 'year_log',
+        'success': lambda r: f"✅ Year-based segregation done. {r['moved_total']} moved, {r['skipped_total']} skipped.",
+        'error': 'year segregation',
+    },
+    'segregate_files_by_resolution': {
+        'module': 'scripts.segregate_by_resolution',
+        'func': 'segregate_files_by_resolution',
+        'is_async': True,
+        'log_prefix': 'resolution_log',
+        'success': lambda r: f"✅ Resolution-based segregation done. {r['moved_total']} moved, {r['skipped_total']} skipped.",
+        'error': 'resolution segregation',
+    },
+    'segregate_files_by_height': {
+        'module': 'scripts.segregate_by_height_res',
+        'func': 'segregate_files_by_height',
+        'is_async': True,
+        'log_prefix': 'height_log',
+        'success': lambda r: f"✅ Height Resolution-based segregation done. {r['moved_total']} moved, {r['skipped_total']} skipped.",
+        'error': 'height segregation',
+    },
+    'compress_videos_in_folder': {
+        'module': 'scripts.compress_videos_in_folder',
+        'func': 'compress_videos_in_folder',
+        'is_async': False,
+        'log_prefix': 'compress_log',
+        'success': lambda r: f"✅ Compressed videos done. {r['compressed_total']} compressed, {r['failed_total']} failed.",
+        'error': 'video compression',
+    },
+    'detect_and_move_corrupt_files': {
+        'module': 'scripts.detect_and_move_corrupt_files',
+        'func': 'detect_and_move_corrupt_files',
+        'is_async': False,
+        'log_prefix': 'corrupt_log',
+        'success': lambda r: f"✅ Detect and move corrupt files done. {r['moved_total']} moved, {r['ok_total']} ok.",
+        'error': 'corrupt file detection',
+    },
+    'segregate_by_size': {
+        'module': 'scripts.segregate_by_size',
+        'func': 'segregate_files_by_size',
+        'is_async': False,
+        'log_prefix': 'size_log',
+        'success': lambda r: '✅ Size-based segregation completed.',
+        'error': 'size segregation',
+    },
+    'move_long_videos': {
+        'module': 'scripts.move_long_videos',
+        'func': 'find_and_move_long_videos',
+        'is_async': True,
+        'log_prefix': 'video_log',
+        'success': lambda r: '✅ Long video segregation completed.',
+        'error': 'long video segregation',
+    },
+    'rename_files': {
+        'module': 'scripts.rename_files',
+        'func': 'rename_files',
+        'is_async': False,
+        'log_prefix': 'rename_ext_log',
+        'success': lambda r: '✅ Extension-based renaming completed.',
+        'error': 'renaming files',
+    },
+    'smart_rename': {
+        'module': 'scripts.smart_rename',
+        'func': 'rename_files_in_folder',
+        'is_async': False,
+        'log_prefix': 'smart_rename_log',
+        'success': lambda r: '✅ Smart renaming completed.',
+        'error': 'smart renaming',
+    },
+    'process_movies': {
+        'module': 'scripts.search_movie_on_imdb',
+        'func': 'process_movies',
+        'call': _call_process_movies,
+        'is_async': False,
+        'log_prefix': 'imdb_log',
+        'success': lambda r: '✅ IMDb movie report completed.',
+        'error': 'processing movies',
+    },
+    'sort_move_files': {
+        'module': 'scripts.sort_move_files',
+        'func': 'sort_move_files',
+        'call': _call_sort_move_files,
+        'is_async': False,
+        'log_prefix': 'sort_move_log',
+        'success': lambda r: f"✅ Sort & Move by extension completed. {r['moved_total']} moved, {r['skipped_total']} skipped.",
+        'error': 'sort & move files',
+    },
+}
+SUPPORTED_OPS = frozenset(OPERATIONS)
+
+
+# One event loop (and its worker pool) shared by every request, started on first use
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _get_loop():
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = new_event_loop()
+            _loop.set_default_executor(ThreadPoolExecutor(thread_name_prefix='filegenie'))
+            threading.Thread(target=_loop.run_forever, name='filegenie-loop', daemon=True).start()
+    return _loop
+
+
+# Held for the whole of a real (non-dry) run; a plain asyncio.Lock, only touched on the loop
+_real_run_lock = asyncio.Lock()
+
+
+# Submitted runs by job id: {'future': concurrent Future of the results, 'selected': [(op, spec, log_name)]}.
+# Kept in memory, so status polls must reach the process that accepted the run.
+JOBS = {}
+MAX_FINISHED_JOBS = 50
+_jobs_lock = threading.Lock()
+
+
+def _add_job(job_id, job):
+    with _jobs_lock:
+        finished = [jid for jid, j in JOBS.items() if j['future'].done()]
+        for jid in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del JOBS[jid]
+        JOBS[job_id] = job
+
+
+def _job_summary(job):
+    """Flash-style messages and log downloads for a finished job."""
+    try:
+        results = job['future'].result()
+    except Exception as e:
+        return [{'category': 'danger', 'text': f'❌ Error running operations: {e}'}], []
+
+    messages, logs = [], []
+    for (op, spec, log_name), result in zip(job['selected'], results):
+        if isinstance(result, Exception):
+            messages.append({'category': 'danger', 'text': f"❌ Error in {spec['error']}: {result}"})
+        else:
+            messages.append({'category': 'success', 'text': spec['success'](result)})
+            logs.append({'name': log_name, 'url': url_for('download_log', logname=log_name)})
+    return messages, logs
+
+
+@lru_cache(maxsize=None)
+def _load_operation(module, func):
+    """Import an operation's script the first time it is requested."""
+    return getattr(importlib.import_module(module), func)
+
+
+async def _start_operation(spec, folder_path, dry_run, log_file, options):
+    """
+    Run one operation. The script is imported and synchronous scripts are run on the
+    loop's worker threads so they don't block it; a failed import is raised here and
+    reported against this operation only.
+    """
+    fn = await asyncio.to_thread(_load_operation, spec['module'], spec['func'])
+    args = (fn, folder_path, dry_run, log_file, options)
+    call = spec.get('call', _call_with_log)
+    if spec['is_async']:
+        return await call(*args)
+    return await asyncio.to_thread(call, *args)
+
+
+async def _run_operations(coros, concurrent=False):
+    """
+    Await the queued operation coroutines on one event loop.
+
+    Dry runs only read the folder (no script creates, moves or renames anything when
+    dry_run is set), so their operations are gathered concurrently.
+    Real runs move files around the same folder and are awaited one after another,
+    one job at a time.
+    Exceptions are returned in place of results so one failing operation doesn't
+    cancel the rest.
+    """
+    if concurrent:
+        return await asyncio.gather(*coros, return_exceptions=True)
+
+    results = []
+    # Jobs submitted while a real run is going wait here, so two runs never move files at once
+    async with _real_run_lock:
+        for coro in coros:
+            try:
+                results.append(await coro)
+            except Exception as e:
+                results.append(e)
+    return results
+
+
 @app.route('/', methods=['GET', 'POST'])
 def index():
-    print(request.method)
-    summary_data = {}
-
     if request.method == 'POST':
-        folder_path = request.form.get('folder_path')
-        operations = request.form.getlist('operations')  # ✅ updated key
-        is_dry_run = request.form.get('dry_run') == 'yes'
-        print("Running:", operations, "→", folder_path, "Dry run:", is_dry_run)
+        form = request.form
+        # Resolved once here; every operation gets the same canonical path
+        folder_path = _resolve_folder(form.get('folder_path'))
+        # Unknown values are dropped; selection order is kept, duplicates are not
+        operations = [op for op in dict.fromkeys(form.getlist('operations')) if op in SUPPORTED_OPS]
+        is_dry_run = form.get('dry_run') == 'yes'
+        # Per-operation settings, read once and handed to the callers as a plain dict
+        options = {
+            'destination_mode': form.get('destination_mode', '2'),
+            'custom_dest_path': form.get('custom_dest_path', ''),
+        }
+        logger.debug("Running %s on %s (dry run: %s)", operations, folder_path, is_dry_run)
 
-        if not folder_path or not os.path.isdir(folder_path):
+        if folder_path is None:
             flash('❌ Please enter a valid folder path.', 'danger')
+        elif not operations:
+            flash('⚠️ Please select at least one operation.', 'warning')
         else:
+            job_id = uuid.uuid4().hex
+            # Jobs can run side by side, so the job id keeps same-second runs from sharing a log
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
 
-            if 'segregate_by_year' in operations:
-                try:
-                    log_file = os.path.join(LOG_DIR, f'year_log_{timestamp}.txt')
-                    result = asyncio.run(segregate_files_by_year(folder_path, dry_run=is_dry_run, log_path=log_file))
-                    flash(
-                        f"✅ Year-based segregation done. {result['moved_total']} moved, {result['skipped_total']} skipped.",
-                        'success')
-                    summary_data['segregate_by_year'] = {'log_file': os.path.basename(log_file)}
-                except Exception as e:
-                    flash(f'❌ Error in year segregation: {e}', 'danger')
-
-            if 'segregate_files_by_resolution' in operations:
-                try:
-                    log_file = os.path.join(LOG_DIR, f'year_log_{timestamp}.txt')
-                    result = asyncio.run(
-                        segregate_files_by_resolution(folder_path, dry_run=is_dry_run, log_path=log_file))
-                    flash(
-                        f"✅ Resolution-based segregation done. {result['moved_total']} moved, {result['skipped_total']} skipped.",
-                        'success')
-                    summary_data['segregate_files_by_resolution'] = {'log_file': os.path.basename(log_file)}
-                except Exception as e:
-                    flash(f'❌ Error in year segregation: {e}', 'danger')
-
-            if 'segregate_files_by_height' in operations:
-                try:
-                    log_file = os.path.join(LOG_DIR, f'year_log_{timestamp}.txt')
-                    result = asyncio.run(segregate_files_by_height(folder_path, dry_run=is_dry_run, log_path=log_file))
-                    flash(
-                        f"✅ Height Resolution-based segregation done. {result['moved_total']} moved, {result['skipped_total']} skipped.",
-                        'success')
-                    summary_data['segregate_files_by_height'] = {'log_file': os.path.basename(log_file)}
-                except Exception as e:
-                    flash(f'❌ Error in year segregation: {e}', 'danger')
-
-            if 'compress_videos_in_folder' in operations:
-                try:
-                    log_file = os.path.join(LOG_DIR, f'year_log_{timestamp}.txt')
-                    result = asyncio.run(compress_videos_in_folder(folder_path))
-                    flash(
-                        f"✅ Compressed videos done. {result['moved_total']} moved, {result['skipped_total']} skipped.",
-                        'success')
-                    summary_data['compress_videos_in_folder'] = {'log_file': os.path.basename(log_file)}
-                except Exception as e:
-                    flash(f'❌ Error in year segregation: {e}', 'danger')
-
-            if 'detect_and_move_corrupt_files' in operations:
-                try:
-                    log_file = os.path.join(LOG_DIR, f'year_log_{timestamp}.txt')
-                    result = asyncio.run(detect_and_move_corrupt_files(folder_path))
-                    flash(
-                        f"✅ Detect and move corrupt files done. {result['moved_total']} moved, {result['skipped_total']} skipped.",
-                        'success')
-                    summary_data['detect_and_move_corrupt_files'] = {'log_file': os.path.basename(log_file)}
-                except Exception as e:
-                    flash(f'❌ Error in year segregation: {e}', 'danger')
-
-            if 'segregate_by_size' in operations:
-                try:
-                    log_file = os.path.join(LOG_DIR, f'size_log_{timestamp}.txt')
-                    segregate_files_by_size(folder_path, dry_run=is_dry_run, log_path=log_file)
-                    flash('✅ Size-based segregation completed.', 'success')
-                    summary_data['segregate_by_size'] = {'log_file': os.path.basename(log_file)}
-                except Exception as e:
-                    flash(f'❌ Error in size segregation: {e}', 'danger')
-
-            if 'move_long_videos' in operations:
-                try:
-                    log_file = os.path.join(LOG_DIR, f'video_log_{timestamp}.txt')
-                    asyncio.run(find_and_move_long_videos(folder_path, dry_run=is_dry_run, log_path=log_file))
-                    flash('✅ Long video segregation completed.', 'success')
-                    summary_data['move_long_videos'] = {'log_file': os.path.basename(log_file)}
-                except Exception as e:
-                    flash(f'❌ Error in long video segregation: {e}', 'danger')
-
-            if 'rename_files' in operations:
-                try:
-                    log_file = os.path.join(LOG_DIR, f'rename_ext_log_{timestamp}.txt')
-                    rename_files(folder_path, dry_run=is_dry_run, log_path=log_file)
-                    flash('✅ Extension-based renaming completed.', 'success')
-                    summary_data['rename_files'] = {'log_file': os.path.basename(log_file)}
-                except Exception as e:
-                    flash(f'❌ Error in renaming files: {e}', 'danger')
-
-            if 'smart_rename' in operations:
-                try:
-                    log_file = os.path.join(LOG_DIR, f'smart_rename_log_{timestamp}.txt')
-                    rename_files_in_folder(folder_path, dry_run=is_dry_run, log_path=log_file)
-                    flash('✅ Smart renaming completed.', 'success')
-                    summary_data['smart_rename'] = {'log_file': os.path.basename(log_file)}
-                except Exception as e:
-                    flash(f'❌ Error during smart renaming: {e}', 'danger')
-
-            if 'process_movies' in operations:
-                try:
-                    log_file = os.path.join(LOG_DIR, f'smart_rename_log_{timestamp}.txt')
-                    process_movies(folder_path)
-                    flash('✅ Smart renaming completed.', 'success')
-                    summary_data['process_movies'] = {'log_file': os.path.basename(log_file)}
-                except Exception as e:
-                    flash(f'❌ Error during smart renaming: {e}', 'danger')
-
-            if 'sort_move_files' in operations:
-                try:
-                    log_file = os.path.join(LOG_DIR, f'sort_move_log_{timestamp}.txt')
-                    destination_mode = request.form.get('destination_mode', '2')
-                    custom_dest_path = request.form.get('custom_dest_path', '')
-                    
-                    # For mode 3, validate custom destination path
-                    dest_path = custom_dest_path if destination_mode == '3' else None
-                    
-                    result = sort_move_files(
-                        folder_path, 
-                        destination_mode, 
-                        dest_path=dest_path,
-                        dry_run=is_dry_run, 
-                        log_path=log_file
-                    )
-                    flash(
-                        f"✅ Sort & Move by extension completed. {result['moved_total']} moved, {result['skipped_total']} skipped.",
-                        'success'
-                    )
-                    summary_data['sort_move_files'] = {'log_file': os.path.basename(log_file)}
-                except Exception as e:
-                    flash(f'❌ Error in sort & move files: {e}', 'danger')
-
-    return render_template('index.html', summary_data=summary_data)
+            selected = []
+            for op in operations:
+                spec = OPERATIONS[op]
+                selected.append((op, spec, f"{spec['log_prefix']}_{timestamp}_{job_id[:8]}.txt"))
+
+            # Everything is awaited on the shared event loop; the request returns straight
+            # away and the dashboard polls /status/<job_id> until the run finishes.
+            coros = [
+                _start_operation(spec, folder_path, is_dry_run, f"{LOG_PREFIX}{log_name}", options)
+                for _, spec, log_name in selected
+            ]
+            future = asyncio.run_coroutine_threadsafe(
+                _run_operations(coros, concurrent=is_dry_run), _get_loop())
+
+            _add_job(job_id, {'future': future, 'selected': selected})
+            return redirect(url_for('index', job=job_id))
+
+    job_id = request.args.get('job')
+    return render_template('index.html', job_id=job_id if job_id in JOBS else None)
+
+
+@app.route('/status/<job_id>')
+def job_status(job_id):
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found.'}), 404
+    if not job['future'].done():
+        return jsonify({'done': False})
+
+    messages, logs = _job_summary(job)
+    return jsonify({'done': True, 'messages': messages, 'logs': logs})
 
 
 @app.route('/download_log/<logname>')
 def download_log(logname):
-    log_path = os.path.join(LOG_DIR, logname)
-    if os.path.exists(log_path):
-        return send_file(log_path, as_attachment=True)
-    else:
-        flash("❌ Log file not found.", "danger")
-        return redirect(url_for('index'))
+    # Only plain .txt names written by the operations can match; anything else is
+    # turned away before the log directory is consulted.
+    if logname == secure_filename(logname) and logname.endswith('.txt'):
+        try:
+            return send_from_directory(LOG_DIR, logname, as_attachment=True, conditional=True)
+        except NotFound:
+            pass
+    flash("❌ Log file not found.", "danger")
+    return redirect(url_for('index'))
 
 
 if __name__ == '__main__':
-    app.run(debug=True)
+    debug = os.environ.get('FLASK_DEBUG') == '1'
+    logging.basicConfig(level=logging.DEBUG if debug else logging.WARNING)
+    try:
+        from waitress import serve
+    except ImportError:
+        serve = None
+
+    if debug or serve is None:
+        # The reloader would import the app twice; opt into the debugger with FLASK_DEBUG=1
+        app.run(debug=debug, threaded=True, use_reloader=False)
+    else:
+        # One process, so /status polls always reach the job store that started the run
+        serve(app, host='127.0.0.1', port=5000, threads=min(32, (os.cpu_count() or 1) * 4))
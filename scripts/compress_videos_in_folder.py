@@ -1,11 +1,59 @@
 import os
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 
+try:
+    from scripts.video_probe import VIDEO_EXTENSIONS
+except ImportError:
+    # Run directly (python scripts/...): this folder is on sys.path, the package isn't
+    from video_probe import VIDEO_EXTENSIONS
 
-def compress_video(input_file: str, output_file: str, crf: int = 28, preset: str = "medium"):
+# libx265 preset -> closest NVENC preset (p1 fastest ... p7 best quality)
+NVENC_PRESETS = {
+    "ultrafast": "p1", "superfast": "p1", "veryfast": "p2", "faster": "p3", "fast": "p4",
+    "medium": "p5", "slow": "p6", "slower": "p7", "veryslow": "p7",
+}
+
+
+@lru_cache(maxsize=None)
+def has_nvenc() -> bool:
+    """
+    Return True if hevc_nvenc (NVIDIA GPU) encoding actually works here.
+
+    Many stock ffmpeg builds list the encoder on machines without a GPU, so a one-frame
+    test encode is run once per process before any real file is sent to it.
+    """
+    try:
+        result = subprocess.run(["ffmpeg", "-hide_banner", "-encoders"],
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+        if "hevc_nvenc" not in result.stdout:
+            return False
+        probe = subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error",
+             "-f", "lavfi", "-i", "nullsrc=s=256x256:d=1", "-frames:v", "1",
+             "-c:v", "hevc_nvenc", "-f", "null", "-"],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=30
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return probe.returncode == 0
+
+
+def _video_codec_args(crf: int, preset: str, threads: int, gpu: bool) -> list:
+    if gpu:
+        return ["-c:v", "hevc_nvenc", "-preset", NVENC_PRESETS.get(preset, "p5"),
+                "-rc", "vbr", "-cq", str(crf), "-b:v", "0"]
+    return ["-c:v", "libx265", "-crf", str(crf), "-preset", preset, "-threads", str(threads)]
+
+
+def compress_video(input_file: str, output_file: str, crf: int = 28, preset: str = "medium", threads: int = 0):
     """
-    Compress a video using ffmpeg.
+    Compress a video to HEVC using ffmpeg.
+
+    The NVIDIA hardware encoder is used when it passes has_nvenc(); if an encode fails
+    (no usable GPU, session limit reached, ...) the file is redone with libx265.
 
     Args:
         input_file (str): Path to the input video.
@@ -13,43 +61,89 @@ def compress_video(input_file: str, output_file: str, crf: int = 28, preset: str
         crf (int): Constant Rate Factor (lower = better quality, bigger size). Recommended 23–28.
         preset (str): Speed/efficiency tradeoff (slower = better compression).
                       Options: ultrafast, superfast, veryfast, faster, fast, medium, slow, slower, veryslow
+        threads (int): Decoder/encoder threads for this ffmpeg process (0 = let ffmpeg decide).
     """
-    try:
+    print(f"⚡ Compressing: {input_file} → {output_file}")
+    for gpu in ((True, False) if has_nvenc() else (False,)):
         cmd = [
-            "ffmpeg", "-i", input_file,
-            "-c:v", "libx265", "-crf", str(crf), "-preset", preset,
+            "ffmpeg", "-nostats", "-loglevel", "error",
+            "-threads", str(threads), "-i", input_file,  # decoder threads
+            *_video_codec_args(crf, preset, threads, gpu),
             "-c:a", "aac", "-b:a", "128k",
             "-y",  # overwrite output if exists
             output_file
         ]
-        print(f"⚡ Compressing: {input_file} → {output_file}")
-        subprocess.run(cmd, check=True)
-        print(f"✅ Done: {output_file}")
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Error compressing {input_file}: {e}")
+        try:
+            # Only errors reach stderr, so capturing it stays small even for long encodes
+            subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+            print(f"✅ Done: {output_file}")
+            return True
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Error compressing {input_file}{' on the GPU' if gpu else ''}: {e}")
+            if e.stderr:
+                print(e.stderr.strip())
+    return False
 
 
-def compress_videos_in_folder(input_folder: str, crf: int = 28, preset: str = "medium"):
+def compress_videos_in_folder(input_folder: str, crf: int = 28, preset: str = "medium",
+                              dry_run: bool = False, log_path: str = None, max_workers: int = None):
     """
     Compress all videos in a folder and save them in a 'Compressed' subfolder.
+
+    Up to max_workers ffmpeg processes run at once (default: one per 4 CPUs), and the
+    CPUs are split between them so the encoders don't oversubscribe the machine.
     """
     input_path = Path(input_folder).resolve()
     if not input_path.is_dir():
         raise Exception(f"❌ '{input_path}' is not a valid directory.")
 
     output_folder = input_path / "Compressed"
-    output_folder.mkdir(exist_ok=True)
+    if not dry_run:
+        output_folder.mkdir(exist_ok=True)
+
+    files = [f for f in input_path.iterdir() if f.suffix.lower() in VIDEO_EXTENSIONS]
 
-    video_extensions = {".mp4", ".mkv", ".avi", ".mov", ".flv", ".wmv"}
-    files = [f for f in input_path.iterdir() if f.suffix.lower() in video_extensions]
+    log_lines = [f"Starting compression in: {input_path}", f"Dry Run: {dry_run}"]
+    compressed, failed = 0, 0
 
     if not files:
         print("⚠️ No video files found.")
-        return
+        log_lines.append("⚠️ No video files found.")
+
+    if dry_run:
+        for file in files:
+            log_lines.append(f"[Dry Run] Would compress: {file} -> {output_folder / file.name}")
+    elif files:
+        cpus = os.cpu_count() or 1
+        workers = min(len(files), max_workers or max(1, cpus // 4))
+        threads = min(64, max(1, cpus // workers))
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # map keeps the results in file order, so the log reads the same as a serial run
+            results = executor.map(
+                lambda file: compress_video(str(file), str(output_folder / file.name),
+                                            crf=crf, preset=preset, threads=threads),
+                files
+            )
+            for file, ok in zip(files, results):
+                if ok:
+                    compressed += 1
+                    log_lines.append(f"Compressed: {file} -> {output_folder / file.name}")
+                else:
+                    failed += 1
+                    log_lines.append(f"Error compressing: {file}")
+
+    log_lines.append(f"\n✅ Completed. Compressed: {compressed}, Failed: {failed}")
+
+    if log_path:
+        with open(log_path, "w", encoding="utf-8") as f:
+            f.writelines(line + "\n" for line in log_lines)
 
-    for file in files:
-        output_file = output_folder / file.name
-        compress_video(str(file), str(output_file), crf=crf, preset=preset)
+    return {
+        "compressed_total": compressed,
+        "failed_total": failed,
+        "log_lines": log_lines
+    }
 
 
 if __name__ == "__main__":
@@ -1,8 +1,15 @@
 import os
 import shutil
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    from scripts.video_probe import VIDEO_EXTENSIONS
+except ImportError:
+    # Run directly (python scripts/...): this folder is on sys.path, the package isn't
+    from video_probe import VIDEO_EXTENSIONS
+
 
 def is_video_corrupt(file_path: Path) -> bool:
     """
@@ -11,16 +18,19 @@ def is_video_corrupt(file_path: Path) -> bool:
     """
     try:
         cmd = [
-            "ffmpeg", "-v", "error", "-i", str(file_path),
+            "ffmpeg", "-v", "error", "-threads", "1", "-i", str(file_path),
             "-f", "null", "-", "-y"
         ]
-        result = subprocess.run(
-            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        proc = subprocess.Popen(
+            cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, errors="replace"
         )
-
-        # If ffmpeg writes anything to stderr, it's probably an error
-        if result.stderr.strip():
-            return True
+        with proc:
+            # If ffmpeg writes anything to stderr, it's probably an error; no need to
+            # decode the rest of the file once it has.
+            for line in proc.stderr:
+                if line.strip():
+                    proc.kill()
+                    return True
         return False
     except Exception:
         return True  # treat as corrupt if ffmpeg itself fails
@@ -38,20 +48,26 @@ def move_corrupt_file(file_path: Path, corrupt_folder: Path, dry_run: bool, log_
     return "moved"
 
 
-def detect_and_move_corrupt_files(folder: str, dry_run: bool = False, log_path: str = None):
+def detect_and_move_corrupt_files(folder: str, dry_run: bool = False, log_path: str = None,
+                                  max_workers: int = None):
     base_path = Path(folder).resolve()
     if not base_path.is_dir():
         raise Exception(f"❌ '{base_path}' is not a valid directory.")
 
     corrupt_folder = base_path / "Corrupt"
-    video_extensions = {".mp4", ".mkv", ".avi", ".mov", ".flv", ".wmv"}
-    files = [f for f in base_path.iterdir() if f.suffix.lower() in video_extensions]
+    files = [f for f in base_path.iterdir() if f.suffix.lower() in VIDEO_EXTENSIONS]
 
     log_lines = [f"Starting corrupt file detection in: {base_path}", f"Dry Run: {dry_run}"]
     moved, skipped = 0, 0
 
-    for file in files:
-        if is_video_corrupt(file):
+    # Each check is a single-threaded decode, so run about one per CPU. Moves stay on
+    # this thread, in file order.
+    workers = max_workers or min(16, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        corrupt_flags = list(executor.map(is_video_corrupt, files))
+
+    for file, corrupt in zip(files, corrupt_flags):
+        if corrupt:
             result = move_corrupt_file(file, corrupt_folder, dry_run, log_lines)
             if result == "moved":
                 moved += 1
@@ -63,7 +79,7 @@ def detect_and_move_corrupt_files(folder: str, dry_run: bool = False, log_path:
 
     if log_path:
         with open(log_path, "w", encoding="utf-8") as f:
-            f.write("\n".join(log_lines))
+            f.writelines(line + "\n" for line in log_lines)
 
     return {
         "moved_total": moved,
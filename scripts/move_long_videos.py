@@ -16,52 +16,60 @@ def get_video_duration(video_path):
     except Exception as e:
         return None
 
-def move_video(video_path, destination_folder, dry_run, log_lines):
+def move_video(video_path, destination_folder, dry_run):
+    """Move one video and return (status, log message)."""
     try:
         destination_path = Path(destination_folder) / Path(video_path).name
         if Path(video_path).parent == Path(destination_folder):
-            log_lines.append(f"[Skipped] Already in correct folder: {video_path}")
-            return "skipped"
+            return "skipped", f"[Skipped] Already in correct folder: {video_path}"
 
         if dry_run:
-            log_lines.append(f"[Dry Run] Would move: {video_path} -> {destination_path}")
-            return "dry_run"
+            return "dry_run", f"[Dry Run] Would move: {video_path} -> {destination_path}"
 
         shutil.move(video_path, destination_path)
-        log_lines.append(f"Moved: {video_path} -> {destination_path}")
-        return "moved"
+        return "moved", f"Moved: {video_path} -> {destination_path}"
     except Exception as e:
-        log_lines.append(f"Error moving {video_path}: {e}")
-        return "error"
+        return "error", f"Error moving {video_path}: {e}"
 
-async def process_video(video_path, destination_folder, faulty_folder, dry_run, executor, log_lines):
+def find_videos(source_folder):
+    return [str(file) for file in Path(source_folder).rglob("*.mp4")]
+
+def write_log(log_path, log_lines):
+    with open(log_path, 'w', encoding='utf-8') as f:
+        f.writelines(line + '\n' for line in log_lines)
+
+async def process_video(video_path, destination_folder, faulty_folder, dry_run, executor):
     loop = asyncio.get_running_loop()
     duration = await loop.run_in_executor(executor, get_video_duration, video_path)
 
     if duration is None:
-        return await loop.run_in_executor(executor, move_video, video_path, faulty_folder, dry_run, log_lines)
+        return await loop.run_in_executor(executor, move_video, video_path, faulty_folder, dry_run)
     elif duration > 480:
-        return await loop.run_in_executor(executor, move_video, video_path, destination_folder, dry_run, log_lines)
+        return await loop.run_in_executor(executor, move_video, video_path, destination_folder, dry_run)
     else:
-        log_lines.append(f"[Skipped] Video too short: {video_path} ({duration:.2f}s)")
-        return "skipped"
+        return "skipped", f"[Skipped] Video too short: {video_path} ({duration:.2f}s)"
 
 async def find_and_move_long_videos(source_folder, dry_run=False, log_path=None):
     destination_folder = os.path.join(source_folder, "Long_Videos")
     faulty_folder = os.path.join(source_folder, "faulty_videos")
 
-    os.makedirs(destination_folder, exist_ok=True)
-    os.makedirs(faulty_folder, exist_ok=True)
+    if not dry_run:
+        os.makedirs(destination_folder, exist_ok=True)
+        os.makedirs(faulty_folder, exist_ok=True)
 
-    video_files = [str(file) for file in Path(source_folder).rglob("*.mp4")]
+    # The recursive walk is blocking I/O; keep it off the shared event loop
+    video_files = await asyncio.to_thread(find_videos, source_folder)
     log_lines = []
     executor = concurrent.futures.ThreadPoolExecutor()
 
     tasks = [
-        process_video(video, destination_folder, faulty_folder, dry_run, executor, log_lines)
+        process_video(video, destination_folder, faulty_folder, dry_run, executor)
         for video in video_files
     ]
-    results = await asyncio.gather(*tasks)
+    # (status, message) per video, in discovery order
+    outcomes = await asyncio.gather(*tasks)
+    results = [status for status, _ in outcomes]
+    log_lines.extend(message for _, message in outcomes)
     executor.shutdown()
 
     moved_count = results.count("moved")
@@ -71,5 +79,4 @@ async def find_and_move_long_videos(source_folder, dry_run=False, log_path=None)
     log_lines.append(f"Total videos skipped: {skipped_count}")
 
     if log_path:
-        with open(log_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(log_lines))
\ No newline at end of file
+        await asyncio.to_thread(write_log, log_path, log_lines)
\ No newline at end of file
@@ -1,49 +1,70 @@
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 
-def rename_file(old_path, new_path, dry_run, log_lines):
+def rename_file(old_path, new_path, dry_run):
+    """Rename one file and return (status, log message)."""
     try:
         if dry_run:
-            log_lines.append(f"[Dry Run] Would rename: {old_path} -> {new_path}")
-            return "dry_run"
+            return "dry_run", f"[Dry Run] Would rename: {old_path} -> {new_path}"
 
         os.rename(old_path, new_path)
-        log_lines.append(f"Renamed: {old_path} -> {new_path}")
-        return "renamed"
+        return "renamed", f"Renamed: {old_path} -> {new_path}"
     except Exception as e:
-        log_lines.append(f"Error renaming file {old_path}: {e}")
-        return "error"
+        return "error", f"Error renaming file {old_path}: {e}"
+
+def _iter_files(directory):
+    """Yield (dirpath, name, path) for every file below directory, like os.walk without symlinked dirs."""
+    stack = [directory]
+    while stack:
+        root = stack.pop()
+        try:
+            with os.scandir(root) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir():
+                if not entry.is_symlink():
+                    stack.append(entry.path)
+            else:
+                yield root, entry.name, entry.path
+
+
+def _new_name(root, file, old_path):
+    if '.' not in file:
+        return old_path + ".zip"
+    if file.endswith(".@@@"):
+        return os.path.join(root, file.rsplit('.', 1)[0] + ".mp4")
+    if file.endswith(".mpeg@@@") or file.endswith(".mpeg@"):
+        return os.path.join(root, file.rsplit('.', 1)[0] + ".mpeg")
+    if file.endswith(".@@@mkv"):
+        return os.path.join(root, file.rsplit('.', 1)[0] + ".mkv")
+    return None
+
 
 def rename_files(directory, dry_run=False, log_path=None):
     log_lines = []
     tasks = []
 
+    # Plan every rename from one scandir pass before touching anything, so renamed
+    # files can't turn up again later in the same directory listing.
+    renames = []
+    for root, file, old_path in _iter_files(directory):
+        new_path = _new_name(root, file, old_path)
+        if new_path and old_path != new_path:
+            renames.append((old_path, new_path))
+
     with ThreadPoolExecutor() as executor:
-        for root, _, files in os.walk(directory):
-            for file in files:
-                old_path = os.path.join(root, file)
-                new_path = None
-
-                if '.' not in file:
-                    new_path = old_path + ".zip"
-                elif file.endswith(".@@@"):
-                    new_path = os.path.join(root, file.rsplit('.', 1)[0] + ".mp4")
-                elif file.endswith(".mpeg@@@"):
-                    new_path = os.path.join(root, file.rsplit('.', 1)[0] + ".mpeg")
-                elif file.endswith(".mpeg@"):
-                    new_path = os.path.join(root, file.rsplit('.', 1)[0] + ".mpeg")
-                elif file.endswith(".@@@mkv"):
-                    new_path = os.path.join(root, file.rsplit('.', 1)[0] + ".mkv")
-
-                if new_path and old_path != new_path:
-                    tasks.append(executor.submit(rename_file, old_path, new_path, dry_run, log_lines))
-
-        for future in as_completed(tasks):
-            future.result()
-
-    renamed_count = log_lines.count("renamed")
+        for old_path, new_path in renames:
+            tasks.append(executor.submit(rename_file, old_path, new_path, dry_run))
+
+        # Collected in submission order, so the log follows the directory walk
+        for future in tasks:
+            status, message = future.result()
+            log_lines.append(message)
+
     log_lines.append(f"\nTotal files processed: {len(tasks)}")
 
     if log_path:
         with open(log_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(log_lines))
+            f.writelines(line + '\n' for line in log_lines)
@@ -1,60 +1,79 @@
 import re
 import os
 import math
-import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from imdbmovies import IMDB
 
+try:
+    from scripts.video_probe import VIDEO_EXTENSIONS
+except ImportError:
+    # Run directly (python scripts/...): this folder is on sys.path, the package isn't
+    from video_probe import VIDEO_EXTENSIONS
+
 
 # ---------------------------
 # Cleaning function
 # ---------------------------
+# Junk words/patterns, joined into one alternation so a name is scanned once
+JUNK_PATTERNS = [
+    r"\b(480p|720p|1080p|2160p|4k|10bit)\b",
+    r"\b(BluRay|WEB[- ]DL|WEBRip|HDRip|DVDRip|BRRip|CAM|HDTS)\b",
+    r"\b(x264|x265|h264|h265|HEVC|AV1)\b",
+    r"\b(AAC|DDP\d\.\d|DTS|TrueHD|Atmos|MP3)\b",
+    r"\b(YTS\d\.\d|YIFY|RARBG|NeoNoir|EVO|FGT|LOL|PSA|HDRush|Spidey|Asiimov|ION10|GalaxyRG|TGx|MkvCage|rmteam)\b",
+    r"\b(Hindi|Urdu|Tamil|Telugu|Malayalam|Kannada|Bengali|Japanese)\b",
+    r"\b(NF|ZEE5|Prime|Hotstar|Disney|AMZN|Netflix)\b",
+    r"\b(TheMoviesBoss|Yo-Movies|yo-movies|4MovieRulz|TamilMV|b13)\b",
+    r"\b(Hain|Mal|Sun|George|Watch|Online|Cleaned|HC|HQ|ESub|ESubs)\b",
+    r"\b(www)\b",
+    r"\b\d{3,4}MB\b",
+    r"[\[\]\(\)«»]"
+]
+JUNK_RE = re.compile("|".join(f"(?:{p})" for p in JUNK_PATTERNS), re.IGNORECASE)
+SEPARATORS = str.maketrans("._", "  ")
+YEAR_RE = re.compile(r"\b(19|20)\d{2}\b")
+WHITESPACE_RE = re.compile(r"\s+")
+
+
 def clean_movie_name(raw_name: str) -> str:
     """Clean a movie folder/file name to extract a probable title."""
-    name = raw_name
-
     # Replace dots/underscores with spaces
-    name = re.sub(r"[._]", " ", name)
+    name = raw_name.translate(SEPARATORS)
 
     # If a year is present, keep everything before & including it
-    year_match = re.search(r"\b(19|20)\d{2}\b", name)
+    year_match = YEAR_RE.search(name)
     if year_match:
         year_end = year_match.end()
         name = name[:year_end]
 
     # Remove junk words/patterns (for cases without year or before year section)
-    patterns = [
-        r"\b(480p|720p|1080p|2160p|4k|10bit)\b",
-        r"\b(BluRay|WEB[- ]DL|WEBRip|HDRip|DVDRip|BRRip|CAM|HDTS)\b",
-        r"\b(x264|x265|h264|h265|HEVC|AV1)\b",
-        r"\b(AAC|DDP\d\.\d|DTS|TrueHD|Atmos|MP3)\b",
-        r"\b(YTS\d\.\d|YIFY|RARBG|NeoNoir|EVO|FGT|LOL|PSA|HDRush|Spidey|Asiimov|ION10|GalaxyRG|TGx|MkvCage|rmteam)\b",
-        r"\b(Hindi|Urdu|Tamil|Telugu|Malayalam|Kannada|Bengali|Japanese)\b",
-        r"\b(NF|ZEE5|Prime|Hotstar|Disney|AMZN|Netflix)\b",
-        r"\b(TheMoviesBoss|Yo-Movies|yo-movies|4MovieRulz|TamilMV|b13)\b",
-        r"\b(Hain|Mal|Sun|George|Watch|Online|Cleaned|HC|HQ|ESub|ESubs)\b",
-        r"\b(www)\b",
-        r"\b\d{3,4}MB\b",
-        r"[\[\]\(\)«»]"
-    ]
-
-    for p in patterns:
-        name = re.sub(p, "", name, flags=re.IGNORECASE)
-
-    return re.sub(r"\s+", " ", name).strip()
+    name = JUNK_RE.sub("", name)
+
+    return WHITESPACE_RE.sub(" ", name).strip()
 
 
 # ---------------------------
 # Helpers for size & date
 # ---------------------------
-def get_size(path: Path) -> int:
+def get_size(path) -> int:
     """Return folder/file size in bytes."""
-    if path.is_file():
-        return path.stat().st_size
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    # One scandir per directory; entries carry their type, so only files are stat'ed
     total = 0
-    for f in path.rglob("*"):
-        if f.is_file():
-            total += f.stat().st_size
+    stack = [path]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                for entry in it:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        total += entry.stat().st_size
+        except OSError:
+            continue
     return total
 
 
@@ -99,25 +118,52 @@ def get_verdict(rating: float) -> str:
     return "No verdict"
 
 
+# ---------------------------
+# Shared IMDb client
+# ---------------------------
+_clients = threading.local()
+
+
+def get_imdb_client() -> IMDB:
+    """
+    Return this thread's IMDb client, creating it on first use.
+
+    The client keeps a requests session, so reusing it keeps connections to IMDb
+    alive between runs. It also stores the last search on itself, hence one per thread.
+    """
+    imdb = getattr(_clients, "imdb", None)
+    if imdb is None:
+        imdb = _clients.imdb = IMDB()
+    return imdb
+
+
 # ---------------------------
 # Main processing function
 # ---------------------------
-def process_movies(parent_folder: str):
+def process_movies(parent_folder: str, log_path: str = None):
     base = Path(parent_folder).resolve()
-    imdb = IMDB()
-    video_extensions = {".mp4", ".mkv", ".avi", ".mov", ".flv", ".wmv"}
+    imdb = get_imdb_client()
 
-    log_path = base / "imdb_log.txt"
+    log_path = log_path or base / "imdb_log.txt"
     results = []
 
-    for sub in base.iterdir():
-        if sub.is_dir():
-            raw_name = sub.name
-        elif sub.is_file() and sub.suffix.lower() in video_extensions:
-            raw_name = sub.stem
-        else:
-            continue
-
+    candidates = []
+    with os.scandir(base) as it:
+        for entry in it:
+            stem, suffix = os.path.splitext(entry.name)
+            if entry.is_dir():
+                candidates.append((entry, entry.name))
+            elif entry.is_file() and suffix.lower() in VIDEO_EXTENSIONS:
+                candidates.append((entry, stem))
+
+    # Walking movie folders is mostly waiting on stat calls, so size them all in parallel
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        sizes = list(executor.map(
+            lambda e: e.stat().st_size if e.is_file() else get_size(e.path),
+            (entry for entry, _ in candidates)
+        ))
+
+    for (_, raw_name), size_bytes in zip(candidates, sizes):
         movie_name = clean_movie_name(raw_name)
         print(f"🔍 Searching IMDb for: '{movie_name}'...")
 
@@ -135,7 +181,6 @@ def process_movies(parent_folder: str):
         rating_val = safe_parse_rating(info.get("rating"))
         summary = info.get("description") or info.get("plot") or "No summary available."
         verdict = get_verdict(rating_val) if rating_val is not None else "Unknown"
-        size_bytes = get_size(sub)
         size_hr = human_readable_size(size_bytes)
 
         results.append({
@@ -174,7 +219,7 @@ def process_movies(parent_folder: str):
         log_lines.append(entry)
 
     with open(log_path, "w", encoding="utf-8") as f:
-        f.write("\n".join(log_lines))
+        f.writelines(line + "\n" for line in log_lines)
 
     print(f"\n📄 IMDb report with size & priority saved at: {log_path}")
 
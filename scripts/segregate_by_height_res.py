@@ -1,55 +1,47 @@
-import os
 import shutil
 import asyncio
-import subprocess
-from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-executor = ThreadPoolExecutor()
+try:
+    from scripts.video_probe import probe_all
+except ImportError:
+    # Run directly (python scripts/...): this folder is on sys.path, the package isn't
+    from video_probe import probe_all
 
-def get_video_height(path: Path) -> str | None:
-    """Extract video height using ffprobe and return like 1080p, 720p etc."""
-    try:
-        cmd = [
-            "ffprobe", "-v", "error",
-            "-select_streams", "v:0",
-            "-show_entries", "stream=height",
-            "-of", "csv=p=0", str(path)
-        ]
-        output = subprocess.check_output(cmd, stderr=subprocess.STDOUT).decode().strip()
-        if output.isdigit():
-            return f"{output}p"
-        return None
-    except Exception:
-        return None
+def get_video_height(dimensions: tuple[int, int] | None) -> str | None:
+    """Turn probed (width, height) into a label like 1080p, 720p etc."""
+    return f"{dimensions[1]}p" if dimensions else None
+
+def list_files(base_path: Path) -> list[Path]:
+    return [f for f in base_path.iterdir() if f.is_file()]
+
+def write_log(log_path: str, log_lines: list) -> None:
+    with open(log_path, 'w', encoding='utf-8') as f:
+        f.writelines(line + '\n' for line in log_lines)
 
 def ensure_folder_exists(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
-def move_file_to_height_folder(file_path: Path, height: str, base_path: Path, dry_run: bool, log_lines: list):
+def move_file_to_height_folder(file_path: Path, height: str, base_path: Path, dry_run: bool) -> tuple[str, str]:
     if not height:
         height = "Unknown_Resolution"
     target_dir = base_path / height
     target_file = target_dir / file_path.name
 
     if file_path.parent.name == height:
-        log_lines.append(f"Skipped (already in {height}): {file_path.name}")
-        return 'skipped'
+        return 'skipped', f"Skipped (already in {height}): {file_path.name}"
 
     if dry_run:
-        log_lines.append(f"[Dry Run] Would move: {file_path.name} -> {target_dir}")
-        return 'moved'
+        return 'moved', f"[Dry Run] Would move: {file_path.name} -> {target_dir}"
 
     ensure_folder_exists(target_dir)
     shutil.move(str(file_path), str(target_file))
-    log_lines.append(f"Moved: {file_path.name} -> {target_dir}")
-    return 'moved'
-
-async def process_file(file_path: Path, base_path: Path, dry_run: bool, log_lines: list):
-    loop = asyncio.get_event_loop()
-    height = await loop.run_in_executor(executor, get_video_height, file_path)
-    result = await loop.run_in_executor(
-        executor, move_file_to_height_folder, file_path, height, base_path, dry_run, log_lines
+    return 'moved', f"Moved: {file_path.name} -> {target_dir}"
+
+async def process_file(file_path: Path, dimensions, base_path: Path, dry_run: bool):
+    height = get_video_height(dimensions)
+    result = await asyncio.to_thread(
+        move_file_to_height_folder, file_path, height, base_path, dry_run
     )
     return result
 
@@ -58,11 +50,18 @@ async def segregate_files_by_height(input_path: str, dry_run: bool = False, log_
     if not base_path.is_dir():
         raise Exception(f"❌ '{base_path}' is not a valid directory.")
 
-    files = [f for f in base_path.iterdir() if f.is_file()]
+    # Directory listing is blocking I/O; keep it off the shared event loop
+    files = await asyncio.to_thread(list_files, base_path)
     log_lines = [f"Starting segregation by height in: {base_path}", f"Dry Run: {dry_run}"]
 
-    tasks = [process_file(f, base_path, dry_run, log_lines) for f in files]
-    results = await asyncio.gather(*tasks)
+    # Probe everything in one batch, then move using the results
+    dimensions = await probe_all(files)
+
+    tasks = [process_file(f, dimensions[f], base_path, dry_run) for f in files]
+    # (status, message) per file, in file order
+    outcomes = await asyncio.gather(*tasks)
+    results = [status for status, _ in outcomes]
+    log_lines.extend(message for _, message in outcomes)
 
     moved = results.count('moved')
     skipped = results.count('skipped')
@@ -70,8 +69,7 @@ async def segregate_files_by_height(input_path: str, dry_run: bool = False, log_
     log_lines.append(f"\n✅ Completed. Moved: {moved}, Skipped: {skipped}")
 
     if log_path:
-        with open(log_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(log_lines))
+        await asyncio.to_thread(write_log, log_path, log_lines)
 
     return {
         'moved_total': moved,
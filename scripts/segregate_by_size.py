@@ -1,6 +1,7 @@
 import os
 import shutil
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
 
 FOLDERS = {
     "FOLDER_10": (0, 10),
@@ -11,45 +12,59 @@ FOLDERS = {
     "FOLDER_150": (120, 150),
     "FOLDER_240": (150, 240)
 }
+# FOLDERS as parallel lists: bucket i holds sizes below FOLDER_UPPER_BOUNDS[i]
+FOLDER_NAMES = list(FOLDERS)
+FOLDER_UPPER_BOUNDS = [max_size for _, max_size in FOLDERS.values()]
 
-def get_size_in_mb(file_path):
-    try:
-        size_bytes = os.path.getsize(file_path)
-        return size_bytes / (1024 * 1024)
-    except Exception as e:
-        return None
+def iter_files_with_size(directory):
+    """
+    Yield (file_path, size_mb) for every file below directory, like os.walk + getsize
+    but reusing each scandir entry; size_mb is None if the file can't be stat'ed.
+    """
+    stack = [directory]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            if entry.is_dir():
+                if not entry.is_symlink():
+                    stack.append(entry.path)
+                continue
+            try:
+                size_mb = entry.stat().st_size / (1024 * 1024)
+            except OSError:
+                size_mb = None
+            yield entry.path, size_mb
 
 def determine_folder(file_size_mb, base_directory):
-    for folder_name, (min_size, max_size) in FOLDERS.items():
-        if min_size <= file_size_mb < max_size:
-            return os.path.join(base_directory, folder_name)
+    index = bisect_right(FOLDER_UPPER_BOUNDS, file_size_mb)
+    if index < len(FOLDER_NAMES):
+        return os.path.join(base_directory, FOLDER_NAMES[index])
     return os.path.join(base_directory, f"folder_{int(file_size_mb // 30) * 30 + 30}")
 
-def move_file(file_path, base_directory, dry_run, log_lines):
-    file_size_mb = get_size_in_mb(file_path)
+def move_file(file_path, file_size_mb, base_directory, dry_run):
+    """Move one file into its size bucket and return (status, log message)."""
     if file_size_mb is None:
-        log_lines.append(f"[Skipped] Size error for {file_path}")
-        return "skipped"
+        return "skipped", f"[Skipped] Size error for {file_path}"
 
     folder_path = determine_folder(file_size_mb, base_directory)
     destination = os.path.join(folder_path, os.path.basename(file_path))
 
     if os.path.dirname(file_path) == folder_path:
-        log_lines.append(f"[Skipped] Already in correct folder: {file_path}")
-        return "skipped"
+        return "skipped", f"[Skipped] Already in correct folder: {file_path}"
 
     if dry_run:
-        log_lines.append(f"[Dry Run] Would move: {file_path} -> {folder_path}")
-        return "dry_run"
+        return "dry_run", f"[Dry Run] Would move: {file_path} -> {folder_path}"
 
     try:
         os.makedirs(folder_path, exist_ok=True)
         shutil.move(file_path, destination)
-        log_lines.append(f"Moved: {file_path} -> {folder_path}")
-        return "moved"
+        return "moved", f"Moved: {file_path} -> {folder_path}"
     except Exception as e:
-        log_lines.append(f"Error moving {file_path} to {folder_path}: {e}")
-        return "error"
+        return "error", f"Error moving {file_path} to {folder_path}: {e}"
 
 def segregate_files_by_size(directory, dry_run=False, log_path=None, max_workers=8):
     log_lines = []
@@ -57,24 +72,23 @@ def segregate_files_by_size(directory, dry_run=False, log_path=None, max_workers
         log_lines.append(f"The directory '{directory}' does not exist.")
         if log_path:
             with open(log_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(log_lines))
+                f.writelines(line + '\n' for line in log_lines)
         return
 
-    files_to_process = [
-        os.path.join(root, file)
-        for root, _, files in os.walk(directory)
-        for file in files
-    ]
+    # Listed in full before anything moves, so moved files aren't picked up again
+    files_to_process = list(iter_files_with_size(directory))
 
     results = []
     with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = {
-            executor.submit(move_file, file_path, directory, dry_run, log_lines): file_path
-            for file_path in files_to_process
-        }
-        for future in as_completed(futures):
-            result = future.result()
-            results.append(result)
+        futures = [
+            executor.submit(move_file, file_path, size_mb, directory, dry_run)
+            for file_path, size_mb in files_to_process
+        ]
+        # Collected in submission order, so the log follows the directory walk
+        for future in futures:
+            status, message = future.result()
+            results.append(status)
+            log_lines.append(message)
 
     moved_count = results.count("moved")
     skipped_count = results.count("skipped")
@@ -84,4 +98,4 @@ def segregate_files_by_size(directory, dry_run=False, log_path=None, max_workers
 
     if log_path:
         with open(log_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(log_lines))
\ No newline at end of file
+            f.writelines(line + '\n' for line in log_lines)
\ No newline at end of file
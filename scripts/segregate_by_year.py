@@ -1,4 +1,3 @@
-import os
 import re
 import shutil
 import asyncio
@@ -17,34 +16,38 @@ def get_file_modified_year(path: Path) -> int:
     mtime = path.stat().st_mtime
     return datetime.fromtimestamp(mtime).year
 
+def list_files_with_year(base_path: Path) -> list[tuple[Path, int]]:
+    """Files directly in base_path, each with its modified year (one stat per file)."""
+    return [(f, get_file_modified_year(f)) for f in base_path.iterdir() if f.is_file()]
+
+def write_log(log_path: str, log_lines: list) -> None:
+    with open(log_path, 'w', encoding='utf-8') as f:
+        f.writelines(line + '\n' for line in log_lines)
+
 def ensure_folder_exists(path: Path) -> None:
     path.mkdir(parents=True, exist_ok=True)
 
-def move_file_to_year_folder(file_path: Path, year: int, base_path: Path, dry_run: bool, log_lines: list):
+def move_file_to_year_folder(file_path: Path, year: int, base_path: Path, dry_run: bool) -> tuple[str, str]:
     target_dir = base_path / str(year)
     target_file = target_dir / file_path.name
 
     if file_path.parent.name == str(year):
-        log_lines.append(f"Skipped (already in {year}): {file_path.name}")
-        return 'skipped'
+        return 'skipped', f"Skipped (already in {year}): {file_path.name}"
 
     if dry_run:
-        log_lines.append(f"[Dry Run] Would move: {file_path.name} -> {target_dir}")
-        return 'moved'
+        return 'moved', f"[Dry Run] Would move: {file_path.name} -> {target_dir}"
 
     ensure_folder_exists(target_dir)
     shutil.move(str(file_path), str(target_file))
-    log_lines.append(f"Moved: {file_path.name} -> {target_dir}")
-    return 'moved'
+    return 'moved', f"Moved: {file_path.name} -> {target_dir}"
 
-async def process_file(file_path: Path, base_path: Path, dry_run: bool, log_lines: list):
-    mod_year = get_file_modified_year(file_path)
+async def process_file(file_path: Path, mod_year: int, base_path: Path, dry_run: bool):
     name_year = extract_year_from_filename(file_path.name)
     target_year = name_year if name_year == mod_year else mod_year
 
     loop = asyncio.get_event_loop()
     result = await loop.run_in_executor(
-        executor, move_file_to_year_folder, file_path, target_year, base_path, dry_run, log_lines
+        executor, move_file_to_year_folder, file_path, target_year, base_path, dry_run
     )
     return result
 
@@ -53,11 +56,15 @@ async def segregate_files_by_year(input_path: str, dry_run: bool = False, log_pa
     if not base_path.is_dir():
         raise Exception(f"❌ '{base_path}' is not a valid directory.")
 
-    files = [f for f in base_path.iterdir() if f.is_file()]
+    # Listing and stat-ing the folder is blocking I/O; keep it off the shared event loop
+    files = await asyncio.to_thread(list_files_with_year, base_path)
     log_lines = [f"Starting segregation by year in: {base_path}", f"Dry Run: {dry_run}"]
 
-    tasks = [process_file(f, base_path, dry_run, log_lines) for f in files]
-    results = await asyncio.gather(*tasks)
+    tasks = [process_file(f, mod_year, base_path, dry_run) for f, mod_year in files]
+    # (status, message) per file, in file order
+    outcomes = await asyncio.gather(*tasks)
+    results = [status for status, _ in outcomes]
+    log_lines.extend(message for _, message in outcomes)
 
     moved = results.count('moved')
     skipped = results.count('skipped')
@@ -65,8 +72,7 @@ async def segregate_files_by_year(input_path: str, dry_run: bool = False, log_pa
     log_lines.append(f"\n✅ Completed. Moved: {moved}, Skipped: {skipped}")
 
     if log_path:
-        with open(log_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(log_lines))
+        await asyncio.to_thread(write_log, log_path, log_lines)
 
     return {
         'moved_total': moved,
@@ -1,18 +1,21 @@
 import os
 import re
-import concurrent.futures
 import time
 from pathlib import Path
 
+COPY_SUFFIX_RE = re.compile(r'\(\d+\)')  # "(1)", "(2)" ... added by downloads/copies
+DISALLOWED_CHARS_RE = re.compile(r'[^a-zA-Z0-9_]')
+
 def rename_file(input_path, existing_names, dry_run, log_lines):
     try:
         directory = input_path.parent
         filename = input_path.name
 
-        filename_no_parens = re.sub(r'\(\d+\)', '', filename).strip()
+        filename_no_parens = COPY_SUFFIX_RE.sub('', filename).strip()
         base, ext = os.path.splitext(filename_no_parens)
-        base_with_underscores = re.sub(r'\s+', '_', base.strip())
-        base_cleaned = re.sub(r'[^a-zA-Z0-9_]', '', base_with_underscores)
+        # split() drops leading/trailing whitespace and collapses runs, like re.sub(r'\s+', '_', ...)
+        base_with_underscores = '_'.join(base.split())
+        base_cleaned = DISALLOWED_CHARS_RE.sub('', base_with_underscores)
         new_filename_base = f"{base_cleaned}{ext}"
 
         if new_filename_base == filename:
@@ -43,7 +46,7 @@ def rename_file(input_path, existing_names, dry_run, log_lines):
         log_lines.append(f"Error renaming {input_path}: {str(e)}")
         return "error"
 
-def rename_files_in_folder(folder_path, dry_run=False, log_path=None, max_workers=4):
+def rename_files_in_folder(folder_path, dry_run=False, log_path=None):
     folder_path = Path(folder_path)
     log_lines = []
 
@@ -59,12 +62,10 @@ def rename_files_in_folder(folder_path, dry_run=False, log_path=None, max_worker
     existing_names = set(str(f) for f in files)
     start_time = time.time()
 
-    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
-        futures = [
-            executor.submit(rename_file, file, existing_names, dry_run, log_lines)
-            for file in files
-        ]
-        concurrent.futures.wait(futures)
+    # One file at a time: each rename is a single quick syscall, and picking a free
+    # name relies on existing_names being updated before the next file is checked.
+    for file in files:
+        rename_file(file, existing_names, dry_run, log_lines)
 
     end_time = time.time()
     log_lines.append(f"\nRenaming completed in {end_time - start_time:.2f} seconds")
@@ -72,4 +73,4 @@ def rename_files_in_folder(folder_path, dry_run=False, log_path=None, max_worker
 
     if log_path:
         with open(log_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(log_lines))
+            f.writelines(line + '\n' for line in log_lines)
@@ -3,7 +3,7 @@ import shutil
 import sys
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from colorama import Fore, Back, Style
+from colorama import Fore
 
 
 def sort_move_files(path, operation_value, dest_path=None, dry_run=False, log_path=None):
@@ -27,7 +27,7 @@ def sort_move_files(path, operation_value, dest_path=None, dry_run=False, log_pa
         log_lines.append(f"{Fore.RED}Source folder path doesn't exist: {path}")
         if log_path:
             with open(log_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(log_lines))
+                f.writelines(line + '\n' for line in log_lines)
         return {'moved_total': 0, 'skipped_total': 0}
     
     # Determine destination based on operation mode
@@ -46,14 +46,14 @@ def sort_move_files(path, operation_value, dest_path=None, dry_run=False, log_pa
             log_lines.append(f"{Fore.RED}Destination path is required for operation mode 3")
             if log_path:
                 with open(log_path, 'w', encoding='utf-8') as f:
-                    f.write('\n'.join(log_lines))
+                    f.writelines(line + '\n' for line in log_lines)
             return {'moved_total': 0, 'skipped_total': 0}
         
         if not os.path.isdir(dest_path):
             log_lines.append(f"{Fore.RED}Destination folder path doesn't exist: {dest_path}")
             if log_path:
                 with open(log_path, 'w', encoding='utf-8') as f:
-                    f.write('\n'.join(log_lines))
+                    f.writelines(line + '\n' for line in log_lines)
             return {'moved_total': 0, 'skipped_total': 0}
         dest = dest_path
         log_lines.append(f"Using custom destination: {dest}")
@@ -61,38 +61,42 @@ def sort_move_files(path, operation_value, dest_path=None, dry_run=False, log_pa
         log_lines.append(f"{Fore.RED}Wrong operation selected: {operation_value}")
         if log_path:
             with open(log_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(log_lines))
+                f.writelines(line + '\n' for line in log_lines)
         return {'moved_total': 0, 'skipped_total': 0}
 
-    # Get list of files and folders to process
-    list_ = []
+    # Get list of files and folders to process (one directory read; DirEntry caches the type)
+    entries = []
     try:
-        list_ = os.listdir(path)
+        with os.scandir(path) as it:
+            entries = list(it)
     except Exception as e:
         log_lines.append(f"{Fore.RED}Error reading directory: {e}")
         if log_path:
             with open(log_path, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(log_lines))
+                f.writelines(line + '\n' for line in log_lines)
         return {'moved_total': 0, 'skipped_total': 0}
 
     # Process files and folders with thread pool
     moved_count = 0
     skipped_count = 0
     
+    parent_items = frozenset(entry.name for entry in entries)
+
     tasks = []
     with ThreadPoolExecutor(max_workers=8) as executor:
-        for item in list_:
-            source_item_path = os.path.join(path, item)
+        for entry in entries:
+            source_item_path = entry.path
             
             # Handle folders separately
-            if os.path.isdir(source_item_path):
+            if entry.is_dir():
                 tasks.append(executor.submit(
                     move_folder_to_fof,
                     source_item_path,
                     dest,
                     path,
                     dry_run,
-                    log_lines
+                    log_lines,
+                    parent_items
                 ))
             else:
                 # Handle files
@@ -121,12 +125,12 @@ def sort_move_files(path, operation_value, dest_path=None, dry_run=False, log_pa
     # Write log file
     if log_path:
         with open(log_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(log_lines))
+            f.writelines(line + '\n' for line in log_lines)
 
     return {'moved_total': moved_count, 'skipped_total': skipped_count}
 
 
-def move_folder_to_fof(source_folder_path, dest, original_path, dry_run, log_lines):
+def move_folder_to_fof(source_folder_path, dest, original_path, dry_run, log_lines, parent_items=None):
     """
     Move a folder to the FoF (Folder of Folders) directory.
     
@@ -136,6 +140,7 @@ def move_folder_to_fof(source_folder_path, dest, original_path, dry_run, log_lin
         original_path: Original source path
         dry_run: If True, only simulate the operation
         log_lines: List to append log messages
+        parent_items: Names found in original_path by the caller's scan (listed here if omitted)
     
     Returns:
         'moved', 'skipped', or 'error' status
@@ -154,7 +159,8 @@ def move_folder_to_fof(source_folder_path, dest, original_path, dry_run, log_lin
         # Skip extension-based folders and special folders
         if os.path.dirname(source_folder_path) == dest and folder_name != "FoF":
             # Check if this is not one of the extension folders we just created
-            parent_items = os.listdir(original_path)
+            if parent_items is None:
+                parent_items = os.listdir(original_path)
             # Only move folders that existed in the original source
             if folder_name not in parent_items or folder_name == "no_extension":
                 log_lines.append(f"[Skipped] System folder: {source_folder_path}")
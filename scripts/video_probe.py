@@ -0,0 +1,313 @@
+import io
+import os
+import struct
+import asyncio
+import sqlite3
+import time
+from pathlib import Path
+
+# Probe results survive between runs. Rows are keyed by file name, size and mtime rather
+# than by path, so a file the segregation scripts moved is still a hit in its new folder.
+CACHE_PATH = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "filegenie" / "ffprobe.db"
+CACHE_SCHEMA_VERSION = 2
+CACHE_MAX_AGE = 90 * 24 * 3600  # rows older than this are pruned whenever new ones are stored
+
+
+# Containers the scripts treat as videos when picking files out of a folder
+VIDEO_EXTENSIONS = frozenset({".mp4", ".mkv", ".avi", ".mov", ".flv", ".wmv"})
+
+MP4_EXTENSIONS = frozenset({".mp4", ".m4v", ".mov"})
+MKV_EXTENSIONS = frozenset({".mkv", ".webm"})
+MAX_HEADER_BYTES = 16 * 1024 * 1024  # moov/Tracks larger than this are left to ffprobe
+
+
+def _mp4_boxes(f, start: int, end: int):
+    """Yield (type, payload_start, payload_end) for the ISO BMFF boxes between start and end."""
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        size, box_type = struct.unpack(">I4s", header)
+        payload = pos + 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            payload += 8
+        elif size == 0:
+            size = end - pos
+        if size < payload - pos:
+            return
+        yield box_type, payload, min(pos + size, end)
+        pos += size
+
+
+def _read_dimensions_mp4(path: Path) -> tuple[int, int] | None:
+    """Width/height of the first video track, from its stsd sample entry (moov/trak/mdia/minf/stbl/stsd)."""
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        moov = next(((s, e) for t, s, e in _mp4_boxes(f, 0, end) if t == b"moov"), None)
+        if not moov or moov[1] - moov[0] > MAX_HEADER_BYTES:
+            return None
+        f.seek(moov[0])
+        data = io.BytesIO(f.read(moov[1] - moov[0]))
+
+    size = len(data.getbuffer())
+    for trak_type, trak_start, trak_end in _mp4_boxes(data, 0, size):
+        if trak_type != b"trak":
+            continue
+        mdia = next(((s, e) for t, s, e in _mp4_boxes(data, trak_start, trak_end) if t == b"mdia"), None)
+        if not mdia:
+            continue
+        children = {t: (s, e) for t, s, e in _mp4_boxes(data, *mdia)}
+        hdlr, minf = children.get(b"hdlr"), children.get(b"minf")
+        # hdlr: version/flags(4), pre_defined(4), handler_type(4)
+        if not hdlr or not minf or data.getbuffer()[hdlr[0] + 8:hdlr[0] + 12] != b"vide":
+            continue
+        stbl = next(((s, e) for t, s, e in _mp4_boxes(data, *minf) if t == b"stbl"), None)
+        stsd = stbl and next(((s, e) for t, s, e in _mp4_boxes(data, *stbl) if t == b"stsd"), None)
+        # stsd: version/flags(4), entry_count(4), then a visual sample entry whose
+        # width/height sit 32 bytes past the start of the entry
+        if not stsd or stsd[1] - stsd[0] < 8 + 36:
+            return None
+        width, height = struct.unpack_from(">HH", data.getbuffer(), stsd[0] + 8 + 32)
+        return (width, height) if width and height else None
+    return None
+
+
+def _read_vint(f, keep_marker: bool) -> int | None:
+    first = f.read(1)
+    if not first:
+        return None
+    byte = first[0]
+    length = 1
+    while length <= 8 and not byte & (0x80 >> (length - 1)):
+        length += 1
+    if length > 8:
+        return None
+    value = byte if keep_marker else byte & (0xFF >> length)
+    rest = f.read(length - 1)
+    if len(rest) < length - 1:
+        return None
+    for b in rest:
+        value = (value << 8) | b
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        return -1  # unknown size
+    return value
+
+
+def _ebml_elements(f, end: int):
+    """Yield (id, payload_start, size) for the EBML elements between the current position and end."""
+    while f.tell() < end:
+        element_id = _read_vint(f, keep_marker=True)
+        size = _read_vint(f, keep_marker=False)
+        if element_id is None or size is None:
+            return
+        start = f.tell()
+        yield element_id, start, size
+        if size < 0:
+            return  # unknown-size child: callers only descend into these, never skip them
+        f.seek(start + size)
+
+
+def _read_dimensions_mkv(path: Path) -> tuple[int, int] | None:
+    """Width/height of the first video track, from Segment/Tracks/TrackEntry/Video."""
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        f.seek(0)
+        segment = None
+        for element_id, start, size in _ebml_elements(f, end):
+            if element_id == 0x18538067:  # Segment
+                segment = (start, end if size < 0 else start + size)
+                break
+        if not segment:
+            return None
+
+        f.seek(segment[0])
+        for element_id, start, size in _ebml_elements(f, segment[1]):
+            if element_id == 0x1F43B675 or size < 0:  # Cluster before Tracks, or unknown size
+                return None
+            if element_id == 0x1654AE6B:  # Tracks
+                if size > MAX_HEADER_BYTES:
+                    return None
+                f.seek(start)
+                tracks = io.BytesIO(f.read(size))
+                break
+        else:
+            return None
+
+    for element_id, start, size in _ebml_elements(tracks, size):
+        if element_id != 0xAE or size < 0:  # TrackEntry
+            continue
+        track_type, video = None, None
+        for child_id, child_start, child_size in _ebml_elements(tracks, start + size):
+            if child_id == 0x83:  # TrackType
+                tracks.seek(child_start)
+                track_type = int.from_bytes(tracks.read(child_size), "big")
+            elif child_id == 0xE0:  # Video
+                video = (child_start, child_start + child_size)
+        if track_type != 1 or not video:
+            tracks.seek(start + size)
+            continue
+        dims = {}
+        tracks.seek(video[0])
+        for child_id, child_start, child_size in _ebml_elements(tracks, video[1]):
+            if child_id in (0xB0, 0xBA):  # PixelWidth, PixelHeight
+                tracks.seek(child_start)
+                dims[child_id] = int.from_bytes(tracks.read(child_size), "big")
+        width, height = dims.get(0xB0), dims.get(0xBA)
+        return (width, height) if width and height else None
+    return None
+
+
+def read_header_dimensions(path: Path) -> tuple[int, int] | None:
+    """
+    Read the first video stream's size straight from an MP4/MOV or MKV/WebM header.
+
+    Returns None for other containers or anything the parser doesn't understand,
+    so the caller can fall back to ffprobe.
+    """
+    suffix = Path(path).suffix.lower()
+    try:
+        if suffix in MP4_EXTENSIONS:
+            return _read_dimensions_mp4(path)
+        if suffix in MKV_EXTENSIONS:
+            return _read_dimensions_mkv(path)
+    except (OSError, struct.error, ValueError):
+        pass
+    return None
+
+
+def _parse_dimensions(output: bytes) -> tuple[int, int] | None:
+    try:
+        width, height = output.decode().strip().splitlines()[0].split("x")[:2]
+        return int(width), int(height)
+    except (UnicodeDecodeError, ValueError, IndexError):
+        return None
+
+
+async def ffprobe_dimensions(path: Path, semaphore: asyncio.Semaphore) -> tuple[int, int] | None:
+    """
+    Return (width, height) of the first video stream as reported by ffprobe, or None.
+
+    Raises OSError when ffprobe can't be started at all, so callers can tell a missing
+    binary apart from a file that has no video stream.
+    """
+    async with semaphore:
+        proc = await asyncio.create_subprocess_exec(
+            "ffprobe", "-v", "error",
+            "-select_streams", "v:0",
+            "-show_entries", "stream=width,height",
+            "-of", "csv=s=x:p=0", str(path),
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+        )
+        output, _ = await proc.communicate()
+    return _parse_dimensions(output) if proc.returncode == 0 else None
+
+
+def _open_cache() -> sqlite3.Connection | None:
+    try:
+        CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(CACHE_PATH, timeout=5, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        if db.execute("PRAGMA user_version").fetchone()[0] != CACHE_SCHEMA_VERSION:
+            # Older layouts were keyed by absolute path; it's only a cache, so start over
+            db.execute("DROP TABLE IF EXISTS probes")
+            db.execute(
+                "CREATE TABLE probes ("
+                "name TEXT, size INTEGER, mtime_ns INTEGER, width INTEGER, height INTEGER, stored_at INTEGER, "
+                "PRIMARY KEY (name, size, mtime_ns))"
+            )
+            db.execute(f"PRAGMA user_version = {CACHE_SCHEMA_VERSION}")
+        return db
+    except (OSError, sqlite3.Error):
+        return None  # no cache is fine, everything just gets probed
+
+
+def _lookup(paths: list) -> tuple[dict, dict, list]:
+    """
+    Resolve what can be answered without ffprobe: the cache, then container headers.
+    Returns (results, cache keys, paths that weren't in the cache).
+    """
+    results, keys, uncached = {}, {}, []
+    db = _open_cache()
+    try:
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                results[path] = None
+                continue
+            keys[path] = (Path(path).name, st.st_size, st.st_mtime_ns)
+            try:
+                row = db and db.execute(
+                    "SELECT width, height FROM probes WHERE name = ? AND size = ? AND mtime_ns = ?", keys[path]
+                ).fetchone()
+            except sqlite3.Error:
+                row = None  # a broken cache must not fail the operation
+            if row:
+                results[path] = tuple(row) if row[0] is not None else None
+                continue
+            uncached.append(path)
+            dimensions = read_header_dimensions(path)
+            if dimensions:
+                results[path] = dimensions
+    finally:
+        if db:
+            db.close()
+    return results, keys, uncached
+
+
+def _store(rows: list) -> None:
+    db = _open_cache()
+    if not db:
+        return
+    try:
+        now = int(time.time())
+        # Autocommit mode would make every row its own transaction
+        db.execute("BEGIN")
+        db.executemany("INSERT OR REPLACE INTO probes VALUES (?, ?, ?, ?, ?, ?)", [(*r, now) for r in rows])
+        db.execute("DELETE FROM probes WHERE stored_at < ?", (now - CACHE_MAX_AGE,))
+        db.execute("COMMIT")
+    except sqlite3.Error:
+        if db.in_transaction:
+            db.rollback()
+    finally:
+        db.close()
+
+
+async def probe_all(paths, max_concurrency: int = None) -> dict:
+    """
+    Probe every path up front and return {path: (width, height) or None}.
+
+    Files whose (name, size, mtime) are already cached, or whose MP4/MKV header can be
+    read directly, never start ffprobe. The rest are probed as concurrent subprocesses,
+    at most max_concurrency at a time.
+    """
+    paths = list(paths)
+    if not paths:
+        return {}
+
+    # Cache and header reads are blocking file I/O; keep them off the event loop
+    results, keys, uncached = await asyncio.to_thread(_lookup, paths)
+
+    misses = [p for p in uncached if p not in results]
+    failed = set()
+    if misses:
+        semaphore = asyncio.Semaphore(max_concurrency or min(32, (os.cpu_count() or 1) * 4))
+        probed = await asyncio.gather(
+            *(ffprobe_dimensions(p, semaphore) for p in misses), return_exceptions=True
+        )
+        for path, dimensions in zip(misses, probed):
+            if isinstance(dimensions, OSError):
+                # ffprobe never ran; leave the file uncached so it's probed again next time
+                failed.add(path)
+                dimensions = None
+            elif isinstance(dimensions, BaseException):
+                raise dimensions
+            results[path] = dimensions
+
+    rows = [(*keys[p], *(results[p] or (None, None))) for p in uncached if p not in failed]
+    if rows:
+        await asyncio.to_thread(_store, rows)
+    return results
@@ -11,4 +11,4 @@ def generate_log_filename(prefix="operation"):
 def write_log(log_path, lines):
     """Write a list of lines to a log file."""
     with open(log_path, 'a', encoding='utf-8') as f:
-        f.write("\n".join(lines) + "\n")
+        f.writelines(line + "\n" for line in lines)